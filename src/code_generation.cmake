@@ -1,3 +1,5 @@
+include_guard(GLOBAL)
+
 include(utilities)
 
 #[[.rst:
@@ -10,7 +12,8 @@ Code Generation
 ***************
 
 The code generation module has functions for generating code in C or C++. This includes code generation to embed
-resources, serving as a replacement for the C23 `#embed`_ directive.
+resources, serving as a replacement for the C23 `#embed`_ directive, and code generation to load large resources
+from an external pack file.
 ]]
 
 #[[.rst:
@@ -255,6 +258,287 @@ function(toolbelt_embed file variable)
     )
 endfunction()
 
+#[[.rst:
+toolbelt_embed_pack
+===================
+
+Packs resources into an external file which is memory-mapped at runtime, rather than compiling them into the
+binary. This is a companion to :cmake:`toolbelt_embed` for large resources, where embedding the data in source code
+would increase build times and binary size.
+
+.. code-block:: cmake
+
+    toolbelt_embed_pack(
+        <file>
+        <variable>
+        <EMBED embed_files...>
+        [NAMESPACE namespace]
+        [OUTPUT_DIR output_dir]
+        [PACK_DIR pack_dir]
+        [ALIGNMENT alignment]
+        [TARGET target]
+        [VISIBILITY visibility]
+    )
+
+This function writes the files contained within :cmake:`EMBED` into a single pack file called
+:cmake:`<variable>.pack` at build time. Each file is stored at an offset that is a multiple of :cmake:`ALIGNMENT`,
+which defaults to ``4096`` so that each resource starts on a page boundary. The padding between resources is filled
+with ASCII spaces, as CMake cannot write zero bytes. The pack is rebuilt when any of the :cmake:`EMBED` files change.
+
+C++ code is generated at the :cmake:`file` header, and a source file with the same name and a ``.cpp`` extension.
+The header declares the pack file name, a content hash of the pack, and the name, offset, size and SHA256 hash of
+each resource in :cpp:`<variable>_entries`. It also declares a :cpp:`<variable>` loader class which maps the pack
+into memory and returns zero-copy views of the resources. The views are :cpp:`std::span<const std::byte>` if
+:cpp:`std::span` is available, otherwise a :cpp:`<variable>_span` with the same :cpp:`data()` and :cpp:`size()`
+members is used. The generated code requires C++17.
+
+The pack starts with a header containing the content hash. :cpp:`<variable>::open` returns :cpp:`std::nullopt` if the
+pack cannot be mapped or if the hash does not match the generated code, which detects a stale pack.
+
+The definitions can be surrounded by a namespace by specifying :cmake:`NAMESPACE`. By default,
+:cmake:`toolbelt_embed_pack` places the generated code in |GENERATED_DIR| and the pack in the directory where
+executables are built, which is |RUNTIME_OUTPUT_DIRECTORY| if it is set or |CURRENT_BINARY_DIR| otherwise. For
+multi-config generators, the pack is placed in a subdirectory named after the configuration. :cmake:`OUTPUT_DIR`
+and :cmake:`PACK_DIR` can be used to change these locations.
+
+.. note:: Each pack file can only be generated once. This function returns an error if another call already generates
+          a pack with the same :cmake:`variable` in the same :cmake:`PACK_DIR`, for example when multiple directories
+          share a |RUNTIME_OUTPUT_DIRECTORY|.
+
+If :cmake:`TARGET` is specified, then |target_sources| is used to add the generated code to the :cmake:`TARGET`
+with :cmake:`VISIBILITY` visibility, and the :cmake:`TARGET` depends on the pack being built. If :cmake:`TARGET`
+is not specified, the pack is built as part of the default ``ALL`` target instead. The default
+visibility is :cmake:`"PRIVATE"`.
+
+This function sets a variable called :cmake:`cmake_toolbelt_ret` with :cmake:`PARENT_SCOPE` to the value of the
+:cmake:`OUTPUT_DIR`.
+
+Examples
+--------
+
+Pack multiple files
+^^^^^^^^^^^^^^^^^^^
+
+This example packs two files and links the loader to :cmake:`application`.
+
+.. code-block:: cmake
+
+   toolbelt_embed_pack(
+       "resources.h"
+       "resources"
+       EMBED "model.bin" "textures.bin"
+       NAMESPACE "application::detail"
+       TARGET application
+   )
+   target_include_directories(application PRIVATE ${cmake_toolbelt_ret})
+
+The resources can then be accessed without copying them:
+
+.. code-block:: c++
+
+   #include "resources.h"
+
+   using application::detail::resources;
+
+   int main() {
+       auto pack = resources::open("resources.pack");
+       if (!pack) {
+           return 1;
+       }
+
+       auto model = pack->find("model.bin");
+       auto textures = pack->get(1);
+
+       return 0;
+   }
+
+.. |RUNTIME_OUTPUT_DIRECTORY| replace:: :variable:`CMAKE_RUNTIME_OUTPUT_DIRECTORY <variable:CMAKE_RUNTIME_OUTPUT_DIRECTORY>`
+.. |CURRENT_BINARY_DIR| replace:: :variable:`CMAKE_CURRENT_BINARY_DIR <variable:CMAKE_CURRENT_BINARY_DIR>`
+]]
+function(toolbelt_embed_pack file variable)
+    # cmake-lint: disable=R0915
+    set(one_value_args NAMESPACE OUTPUT_DIR PACK_DIR ALIGNMENT TARGET VISIBILITY)
+    set(multi_value_args EMBED)
+    cmake_parse_arguments("" "" "${one_value_args}" "${multi_value_args}" ${ARGN})
+
+    toolbelt_required(_EMBED)
+
+    if(NOT DEFINED _ALIGNMENT)
+        set(_ALIGNMENT 4096)
+    endif()
+    if(NOT _ALIGNMENT MATCHES "^[0-9]+$" OR _ALIGNMENT EQUAL 0)
+        _toolbelt_error("toolbelt_embed_pack" "invalid alignment: ${_ALIGNMENT}")
+    endif()
+
+    if(NOT DEFINED _OUTPUT_DIR)
+        set(_OUTPUT_DIR "${CMAKE_CURRENT_BINARY_DIR}/generated")
+    endif()
+    set(pack_config_dir "")
+    if(NOT DEFINED _PACK_DIR)
+        if(DEFINED CMAKE_RUNTIME_OUTPUT_DIRECTORY)
+            set(_PACK_DIR "${CMAKE_RUNTIME_OUTPUT_DIRECTORY}")
+        else()
+            set(_PACK_DIR "${CMAKE_CURRENT_BINARY_DIR}")
+        endif()
+
+        get_property(multi_config GLOBAL PROPERTY GENERATOR_IS_MULTI_CONFIG)
+        if(multi_config)
+            set(pack_config_dir "/$<CONFIG>")
+        endif()
+    endif()
+
+    # Each pack can only be generated by one call.
+    set(pack_file "${variable}.pack")
+    set(pack_status "${_PACK_DIR}/${pack_file}")
+    set(pack "${_PACK_DIR}${pack_config_dir}/${pack_file}")
+    get_property(packs GLOBAL PROPERTY _toolbelt_embed_pack_outputs)
+    if("${pack}" IN_LIST packs)
+        _toolbelt_error(
+            "toolbelt_embed_pack" "pack ${pack_status} is already generated, use a different variable or PACK_DIR"
+        )
+    endif()
+    set_property(GLOBAL APPEND PROPERTY _toolbelt_embed_pack_outputs "${pack}")
+
+    # Get the include guard and namespace comment.
+    string(TOUPPER "${file}" header_stem)
+    string(REPLACE "." "_" def_header ${header_stem})
+
+    if(DEFINED _NAMESPACE)
+        string(TOUPPER "${_NAMESPACE}" namespace_upper)
+        string(REPLACE "::" "_" namespace_upper "${namespace_upper}")
+
+        set(namespace_start "namespace ${_NAMESPACE} {")
+        set(namespace_end "} // namespace ${_NAMESPACE}")
+        set(def_header "${namespace_upper}_${def_header}")
+    endif()
+
+    # The pack starts with a magic string followed by the content hash.
+    set(pack_magic "TBPACK01")
+    string(LENGTH "${pack_magic}" offset)
+    math(EXPR offset "${offset} + 64")
+
+    set(work_dir "${_OUTPUT_DIR}/${variable}_pack")
+    set(cat_files "")
+    set(padding_sizes "")
+    set(entries "")
+    set(hash_input "")
+    set(n_entries 0)
+
+    # Lay out the embedded files, aligning the start of each one.
+    foreach(embed_file IN LISTS _EMBED)
+        cmake_path(ABSOLUTE_PATH embed_file BASE_DIRECTORY "${CMAKE_CURRENT_SOURCE_DIR}" OUTPUT_VARIABLE embed_path)
+
+        file(SIZE "${embed_path}" size)
+        file(SHA256 "${embed_path}" sha256)
+
+        math(EXPR aligned "((${offset} + ${_ALIGNMENT} - 1) / ${_ALIGNMENT}) * ${_ALIGNMENT}")
+        math(EXPR padding_size "${aligned} - ${offset}")
+        list(APPEND padding_sizes ${padding_size})
+        list(APPEND cat_files "${work_dir}/padding_${n_entries}" "${embed_path}")
+
+        string(REPLACE "\\" "\\\\" entry_name "${embed_file}")
+        string(REPLACE "\"" "\\\"" entry_name "${entry_name}")
+        string(APPEND entries "    ${variable}_entry{\"${entry_name}\", ${aligned}U, ${size}U, \"${sha256}\"},\n")
+        string(APPEND hash_input "${embed_file}:${aligned}:${size}:${sha256};")
+
+        math(EXPR offset "${aligned} + ${size}")
+        math(EXPR n_entries "${n_entries} + 1")
+    endforeach()
+    string(STRIP "${entries}" entries)
+
+    string(SHA256 pack_hash "${hash_input}")
+    _toolbelt_status(
+        "toolbelt_embed_pack" "packing ${n_entries} files" ADD_MESSAGES "alignment = ${_ALIGNMENT}" "size = ${offset}"
+        "hash = ${pack_hash}"
+    )
+
+    # Write the padding between files. The first padding contains the pack header. CMake cannot write zero bytes,
+    # so the padding uses spaces. Files are only written if their content changes, so that reconfiguring does not
+    # rebuild the pack.
+    set(index 0)
+    foreach(padding_size IN LISTS padding_sizes)
+        string(REPEAT " " ${padding_size} padding)
+        if(index EQUAL 0)
+            set(padding "${pack_magic}${pack_hash}${padding}")
+        endif()
+
+        file(CONFIGURE OUTPUT "${work_dir}/padding_${index}" CONTENT "${padding}" @ONLY)
+        math(EXPR index "${index} + 1")
+    endforeach()
+
+    # Concatenating at build time avoids reading the files into CMake, which only supports text.
+    set(pack_script "${work_dir}/pack.cmake")
+    list(JOIN cat_files "\" \"" cat_files_quoted)
+    string(
+        CONCAT
+        pack_script_content
+        "# Auto-generated by toolbelt_embed_pack.\n"
+        "execute_process(\n"
+        "    COMMAND \"${CMAKE_COMMAND}\" -E cat \"${cat_files_quoted}\"\n"
+        "    OUTPUT_FILE \"\${pack}\"\n"
+        "    COMMAND_ERROR_IS_FATAL ANY\n"
+        ")\n"
+    )
+    file(CONFIGURE OUTPUT "${pack_script}" CONTENT "${pack_script_content}" @ONLY)
+
+    add_custom_command(
+        OUTPUT "${pack}"
+        COMMAND "${CMAKE_COMMAND}" "-Dpack=${pack}" -P "${pack_script}"
+        DEPENDS ${cat_files} "${pack_script}"
+        COMMENT "Packing ${pack_file}"
+        VERBATIM
+    )
+
+    # The directory is part of the target name so that calls from different directories can use the same variable.
+    string(SHA1 directory_hash "${CMAKE_CURRENT_SOURCE_DIR}")
+    string(SUBSTRING "${directory_hash}" 0 8 directory_hash)
+    set(pack_target "toolbelt_embed_pack_${variable}_${directory_hash}")
+
+    # Without a target to depend on the pack, build it by default.
+    if(DEFINED _TARGET)
+        add_custom_target("${pack_target}" DEPENDS "${pack}")
+    else()
+        add_custom_target("${pack_target}" ALL DEPENDS "${pack}")
+    endif()
+
+    # Regenerate the offsets and hashes when the embedded files change.
+    set_property(
+        DIRECTORY
+        APPEND
+        PROPERTY CMAKE_CONFIGURE_DEPENDS ${_EMBED}
+    )
+
+    cmake_path(GET file FILENAME header_name)
+    cmake_path(APPEND _OUTPUT_DIR "${file}" OUTPUT_VARIABLE file)
+    cmake_path(REPLACE_EXTENSION file LAST_ONLY ".cpp" OUTPUT_VARIABLE source)
+
+    _toolbelt_embed_pack_templates()
+    file(CONFIGURE OUTPUT "${file}" CONTENT "${header_template}" @ONLY)
+    file(CONFIGURE OUTPUT "${source}" CONTENT "${source_template}" @ONLY)
+
+    _toolbelt_status("toolbelt_embed_pack" "generated output files at ${file} and ${source}")
+    if(pack_config_dir)
+        _toolbelt_status("toolbelt_embed_pack" "pack file at ${pack_status} in a subdirectory for each configuration")
+    else()
+        _toolbelt_status("toolbelt_embed_pack" "pack file at ${pack_status}")
+    endif()
+
+    if(DEFINED _TARGET)
+        if(NOT DEFINED _VISIBILITY)
+            set(_VISIBILITY PRIVATE)
+        endif()
+
+        _toolbelt_status("toolbelt_embed_pack" "linking generated files to target ${_TARGET}")
+        target_sources(${_TARGET} ${_VISIBILITY} ${file} ${source})
+        add_dependencies(${_TARGET} "${pack_target}")
+    endif()
+
+    set(cmake_toolbelt_ret
+        ${_OUTPUT_DIR}
+        PARENT_SCOPE
+    )
+endfunction()
+
 #[[
 Used to define a variable value when generating code for embedding files into source code.
 The ``line_end`` specifies the line ending for each line of the input, for example, an extra backslash.
@@ -285,3 +569,229 @@ macro(_toolbelt_embed_lines line_end hex)
     # No line ending for last element. Escape to treat special characters.
     string(REGEX REPLACE "\\${line_end}$" "" value "${value}")
 endmacro()
+
+#[[
+Defines the ``header_template`` and ``source_template`` used by ``toolbelt_embed_pack`` to generate the pack
+offsets and loader. The templates are configured using ``@ONLY`` substitutions.
+]]
+macro(_toolbelt_embed_pack_templates)
+    set(header_template
+        [=[// Auto-generated by toolbelt_embed_pack.
+// NOLINTBEGIN
+#ifndef @def_header@
+#define @def_header@
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <optional>
+#include <string_view>
+
+#if __has_include(<version>)
+#include <version>
+#endif
+#if defined(__cpp_lib_span)
+#include <span>
+#endif
+
+@namespace_start@
+#if defined(__cpp_lib_span)
+using @variable@_span = std::span<const std::byte>;
+#else
+class @variable@_span {
+public:
+    constexpr @variable@_span() noexcept = default;
+    constexpr @variable@_span(const std::byte* data, std::size_t size) noexcept : data_{data}, size_{size} {}
+
+    constexpr const std::byte* data() const noexcept { return data_; }
+    constexpr std::size_t size() const noexcept { return size_; }
+    constexpr bool empty() const noexcept { return size_ == 0; }
+    constexpr const std::byte* begin() const noexcept { return data_; }
+    constexpr const std::byte* end() const noexcept { return data_ + size_; }
+    constexpr const std::byte& operator[](std::size_t index) const noexcept { return data_[index]; }
+
+private:
+    const std::byte* data_ = nullptr;
+    std::size_t size_ = 0;
+};
+#endif
+
+struct @variable@_entry {
+    std::string_view name;
+    std::uint64_t offset;
+    std::uint64_t size;
+    std::string_view sha256;
+};
+
+inline constexpr std::string_view @variable@_file_name = "@pack_file@";
+inline constexpr std::string_view @variable@_hash = "@pack_hash@";
+inline constexpr std::array<@variable@_entry, @n_entries@> @variable@_entries = {
+    @entries@
+};
+
+class @variable@ {
+public:
+    static std::optional<@variable@> open(const char* path);
+
+    @variable@(const @variable@&) = delete;
+    @variable@& operator=(const @variable@&) = delete;
+    @variable@(@variable@&& other) noexcept;
+    @variable@& operator=(@variable@&& other) noexcept;
+    ~@variable@();
+
+    @variable@_span get(std::size_t index) const noexcept;
+    std::optional<@variable@_span> find(std::string_view name) const noexcept;
+
+private:
+    @variable@(const std::byte* data, std::size_t size) noexcept;
+    void unmap() noexcept;
+
+    const std::byte* data_ = nullptr;
+    std::size_t size_ = 0;
+};
+@namespace_end@
+
+#endif // @def_header@
+// NOLINTEND
+]=]
+    )
+
+    set(source_template
+        [=[// Auto-generated by toolbelt_embed_pack.
+// NOLINTBEGIN
+#include "@header_name@"
+
+#include <cstring>
+#include <utility>
+
+#if defined(_WIN32)
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+@namespace_start@
+namespace {
+constexpr std::string_view @variable@_magic = "@pack_magic@";
+constexpr std::uint64_t @variable@_size = @offset@U;
+} // namespace
+
+std::optional<@variable@> @variable@::open(const char* path) {
+#if defined(_WIN32)
+    HANDLE file = CreateFileA(
+        path, GENERIC_READ, FILE_SHARE_READ, nullptr, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, nullptr
+    );
+    if (file == INVALID_HANDLE_VALUE) {
+        return std::nullopt;
+    }
+
+    LARGE_INTEGER file_size{};
+    if (!GetFileSizeEx(file, &file_size) || file_size.QuadPart == 0) {
+        CloseHandle(file);
+        return std::nullopt;
+    }
+
+    HANDLE mapping = CreateFileMappingA(file, nullptr, PAGE_READONLY, 0, 0, nullptr);
+    CloseHandle(file);
+    if (mapping == nullptr) {
+        return std::nullopt;
+    }
+
+    void* view = MapViewOfFile(mapping, FILE_MAP_READ, 0, 0, 0);
+    CloseHandle(mapping);
+    if (view == nullptr) {
+        return std::nullopt;
+    }
+    const auto size = static_cast<std::size_t>(file_size.QuadPart);
+#else
+    const int file = ::open(path, O_RDONLY | O_CLOEXEC);
+    if (file == -1) {
+        return std::nullopt;
+    }
+
+    struct stat file_stat{};
+    if (::fstat(file, &file_stat) == -1 || file_stat.st_size == 0) {
+        ::close(file);
+        return std::nullopt;
+    }
+    const auto size = static_cast<std::size_t>(file_stat.st_size);
+
+    // Pages are loaded on demand when the resources are accessed.
+    void* view = ::mmap(nullptr, size, PROT_READ, MAP_PRIVATE, file, 0);
+    ::close(file);
+    if (view == MAP_FAILED) {
+        return std::nullopt;
+    }
+#endif
+
+    @variable@ pack{static_cast<const std::byte*>(view), size};
+
+    // Reject a pack which does not match the generated offsets.
+    const auto* header = static_cast<const char*>(view);
+    if (size != @variable@_size || std::memcmp(header, @variable@_magic.data(), @variable@_magic.size()) != 0 ||
+        std::memcmp(header + @variable@_magic.size(), @variable@_hash.data(), @variable@_hash.size()) != 0) {
+        return std::nullopt;
+    }
+
+    return pack;
+}
+
+@variable@::@variable@(const std::byte* data, std::size_t size) noexcept : data_{data}, size_{size} {}
+
+@variable@::@variable@(@variable@&& other) noexcept
+    : data_{std::exchange(other.data_, nullptr)}, size_{std::exchange(other.size_, 0)} {}
+
+@variable@& @variable@::operator=(@variable@&& other) noexcept {
+    if (this != &other) {
+        unmap();
+        data_ = std::exchange(other.data_, nullptr);
+        size_ = std::exchange(other.size_, 0);
+    }
+    return *this;
+}
+
+@variable@::~@variable@() { unmap(); }
+
+void @variable@::unmap() noexcept {
+    if (data_ == nullptr) {
+        return;
+    }
+
+#if defined(_WIN32)
+    UnmapViewOfFile(data_);
+#else
+    ::munmap(const_cast<std::byte*>(data_), size_);
+#endif
+    data_ = nullptr;
+    size_ = 0;
+}
+
+@variable@_span @variable@::get(std::size_t index) const noexcept {
+    if (index >= @variable@_entries.size()) {
+        return {};
+    }
+
+    const auto& entry = @variable@_entries[index];
+    return {data_ + entry.offset, static_cast<std::size_t>(entry.size)};
+}
+
+std::optional<@variable@_span> @variable@::find(std::string_view name) const noexcept {
+    for (std::size_t index = 0; index < @variable@_entries.size(); ++index) {
+        if (@variable@_entries[index].name == name) {
+            return get(index);
+        }
+    }
+
+    return std::nullopt;
+}
+@namespace_end@
+// NOLINTEND
+]=]
+    )
+endmacro()
@@ -1,3 +1,5 @@
+include_guard(GLOBAL)
+
 include(utilities)
 
 #[[.rst:
@@ -255,53 +257,124 @@ function(toolbelt_add_dep target dependency)
     set(multi_value_args LINK_COMPONENTS FIND_PACKAGE_ARGS)
     cmake_parse_arguments("" "" "${one_value_args}" "${multi_value_args}" ${ARGN})
 
-    if(NOT ${dependency}_FOUND)
-        get_property(
-            before_importing
-            DIRECTORY "${CMAKE_SOURCE_DIR}"
-            PROPERTY IMPORTED_TARGETS
-        )
+    _toolbelt_find_dep("toolbelt_add_dep" "${dependency}" "${_VERSION}" "${_FIND_PACKAGE_ARGS}" "")
 
-        find_package(${dependency} ${_VERSION} ${_FIND_PACKAGE_ARGS})
+    # Override the components if linking manually.
+    set(components "${_toolbelt_find_dep_components}")
+    if(DEFINED _LINK_COMPONENTS)
+        set(components "${_LINK_COMPONENTS}")
+    endif()
 
-        # Set a property containing the imported targets of this find package call.
-        get_property(
-            after_importing
-            DIRECTORY "${CMAKE_SOURCE_DIR}"
-            PROPERTY IMPORTED_TARGETS
-        )
-        list(REMOVE_ITEM after_importing "${before_importing}")
+    if(NOT components)
+        _toolbelt_status("toolbelt_add_dep" "no components of ${dependency} linked to ${target}")
+        return()
+    endif()
 
-        if(after_importing)
-            list(JOIN after_importing ", " imports)
-            _toolbelt_status("toolbelt_add_dep" "found ${dependency} with components: ${imports}")
-        endif()
+    foreach(component IN LISTS components)
+        target_link_libraries("${target}" "${_VISIBILITY}" "${component}")
+        _toolbelt_status("toolbelt_add_dep" "component ${component} linked to ${target}")
+    endforeach()
 
-        set(imported_targets_name "_program_dependencies_${dependency}")
-        set_property(DIRECTORY "${CMAKE_SOURCE_DIR}" PROPERTY "${imported_targets_name}" "${after_importing}")
-    endif()
+    _toolbelt_status(
+        "toolbelt_add_dep" "linked ${dependency} to ${target}" ADD_MESSAGES "version = ${_VERSION}"
+        "visibility = ${_VISIBILITY}"
+    )
+endfunction()
 
-    # Override the components if linking manually.
-    get_property(
-        components
-        DIRECTORY "${CMAKE_SOURCE_DIR}"
-        PROPERTY "${imported_targets_name}"
+#[[.rst:
+toolbelt_add_deps
+=================
+
+A batch form of :cmake:`toolbelt_add_dep` which links multiple dependencies to multiple targets.
+
+.. code-block:: cmake
+
+    toolbelt_add_deps(
+        TARGETS targets...
+        DEPENDENCIES dependencies...
+        [VISIBILITY visibility]
+        [LINK_COMPONENTS link_components...]
+        [FIND_PACKAGE_ARGS extra_args...]
+    )
+
+This function calls |find_package| once for each of the :cmake:`DEPENDENCIES` and links all of their components to
+each of the :cmake:`TARGETS` using a single |target_link_libraries| call per target, with an optional
+:cmake:`VISIBILITY`. The components are determined in the same way as :cmake:`toolbelt_add_dep`, and a single status
+message summarising the linked dependencies is printed.
+
+The components found for a dependency are cached for the current directory and its subdirectories, and shared with
+:cmake:`toolbelt_add_dep`, so a dependency which has already been found with the same arguments does not call
+|find_package| again. If a dependency is found again
+with different arguments, any newly imported targets are added to the cached components, and the cached components
+are kept if no new targets are imported.
+New components are found by taking the targets appended to |IMPORTED_TARGETS| after each |find_package| call,
+rather than comparing the full list of imported targets.
+
+Set :cmake:`LINK_COMPONENTS` to manually specify which components should be linked to the targets, and
+:cmake:`FIND_PACKAGE_ARGS` to pass additional arguments to each |find_package| call.
+
+.. note:: :cmake:`toolbelt_add_deps` does not accept a version. Use :cmake:`toolbelt_add_dep` for dependencies which
+          require a version.
+
+Examples
+--------
+
+Link multiple dependencies to multiple targets
+^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+
+This example finds :cmake:`ZLIB` and :cmake:`BZip2` and links all of their components privately to
+:cmake:`target` and :cmake:`other_target`:
+
+.. code-block:: cmake
+
+    toolbelt_add_deps(
+        TARGETS target other_target
+        DEPENDENCIES ZLIB BZip2
+        VISIBILITY PRIVATE
+        FIND_PACKAGE_ARGS REQUIRED
     )
+]]
+function(toolbelt_add_deps)
+    set(one_value_args VISIBILITY)
+    set(multi_value_args TARGETS DEPENDENCIES LINK_COMPONENTS FIND_PACKAGE_ARGS)
+    cmake_parse_arguments("" "" "${one_value_args}" "${multi_value_args}" ${ARGN})
+
+    toolbelt_required(_TARGETS)
+    toolbelt_required(_DEPENDENCIES)
+
+    # Carry the number of imported targets between find_package calls.
+    set(_toolbelt_find_dep_count "")
+    set(components "")
+    foreach(dependency IN LISTS _DEPENDENCIES)
+        _toolbelt_find_dep(
+            "toolbelt_add_deps" "${dependency}" "" "${_FIND_PACKAGE_ARGS}" "${_toolbelt_find_dep_count}"
+        )
+        list(APPEND components ${_toolbelt_find_dep_components})
+    endforeach()
+
+    # Override the components if linking manually.
     if(DEFINED _LINK_COMPONENTS)
         set(components "${_LINK_COMPONENTS}")
     endif()
+    list(REMOVE_DUPLICATES components)
 
-    if(DEFINED components)
-        foreach(component IN LISTS components)
-            target_link_libraries("${target}" "${_VISIBILITY}" "${component}")
-            _toolbelt_status("toolbelt_add_dep" "component ${component} linked to ${target}")
-        endforeach()
+    list(JOIN _DEPENDENCIES ", " dependencies)
+    list(JOIN _TARGETS ", " targets)
 
-        _toolbelt_status(
-            "toolbelt_add_dep" "linked ${dependency} to ${target}" ADD_MESSAGES "version = ${_VERSION}"
-            "visibility = ${_VISIBILITY}"
-        )
+    if(NOT components)
+        _toolbelt_status("toolbelt_add_deps" "no components of ${dependencies} linked to ${targets}")
+        return()
     endif()
+
+    foreach(target IN LISTS _TARGETS)
+        target_link_libraries(${target} ${_VISIBILITY} ${components})
+    endforeach()
+
+    list(JOIN components ", " linked_components)
+    _toolbelt_status(
+        "toolbelt_add_deps" "linked ${dependencies} to ${targets}" ADD_MESSAGES "components = ${linked_components}"
+        "visibility = ${_VISIBILITY}"
+    )
 endfunction()
 
 #[[.rst:
@@ -387,3 +460,105 @@ macro(_toolbelt_check_cached var status)
         return()
     endif()
 endmacro()
+
+#[[
+A function which is used within ``toolbelt_add_dep`` and ``toolbelt_add_deps`` to find a dependency and set
+``_toolbelt_find_dep_components`` in the parent scope to its components. The components are cached per dependency
+on the current directory and shared by both functions. Imported targets are visible in subdirectories, so the cache
+of the closest parent directory is used if the current directory does not have one.
+
+``find_package`` is skipped if the dependency was already found with the same arguments, or if it is cached and
+``<dependency>_FOUND`` is set. When ``find_package`` runs with different arguments, the newly imported targets are
+added to the cached components. Only non-empty components are cached, so a call which imports no new targets, for
+example because a package config guards its targets with ``if(NOT TARGET ...)``, never replaces them.
+
+New imported targets are the tail of the current directory's ``IMPORTED_TARGETS`` after the ``count`` targets which
+existed before calling ``find_package``. If ``count`` is empty, it is read from ``IMPORTED_TARGETS``. The updated
+count is set in ``_toolbelt_find_dep_count`` in the parent scope so that consecutive calls avoid reading the list
+again.
+]]
+function(_toolbelt_find_dep function dependency version find_package_args count)
+    set(imported_targets_name "_program_dependencies_${dependency}")
+    set(imported_args_name "_program_dependencies_args_${dependency}")
+    set(args "${version};${find_package_args}")
+
+    # Find the closest directory with cached components.
+    set(is_cached FALSE)
+    set(cached_args "")
+    set(components "")
+    set(directory "${CMAKE_CURRENT_SOURCE_DIR}")
+    while(directory)
+        get_property(
+            is_cached
+            DIRECTORY "${directory}"
+            PROPERTY "${imported_targets_name}"
+            SET
+        )
+        if(is_cached)
+            get_property(
+                cached_args
+                DIRECTORY "${directory}"
+                PROPERTY "${imported_args_name}"
+            )
+            get_property(
+                components
+                DIRECTORY "${directory}"
+                PROPERTY "${imported_targets_name}"
+            )
+            break()
+        endif()
+
+        get_property(
+            directory
+            DIRECTORY "${directory}"
+            PROPERTY PARENT_DIRECTORY
+        )
+    endwhile()
+
+    if(NOT is_cached OR (NOT "${cached_args}" STREQUAL "${args}" AND NOT ${dependency}_FOUND))
+        if("${count}" STREQUAL "")
+            get_property(
+                before_importing
+                DIRECTORY "${CMAKE_CURRENT_SOURCE_DIR}"
+                PROPERTY IMPORTED_TARGETS
+            )
+            list(LENGTH before_importing count)
+        endif()
+
+        find_package(${dependency} ${version} ${find_package_args})
+
+        # Imported targets are only ever appended, so the new targets are at the end of the list.
+        get_property(
+            after_importing
+            DIRECTORY "${CMAKE_CURRENT_SOURCE_DIR}"
+            PROPERTY IMPORTED_TARGETS
+        )
+        list(LENGTH after_importing after_count)
+        set(imported "")
+        if(after_count GREATER count)
+            list(SUBLIST after_importing ${count} -1 imported)
+        endif()
+        set(count ${after_count})
+
+        # Keep existing components if nothing new was imported.
+        if(imported)
+            list(JOIN imported ", " imports)
+            _toolbelt_status("${function}" "found ${dependency} with components: ${imports}")
+
+            list(APPEND components ${imported})
+            list(REMOVE_DUPLICATES components)
+
+            set_property(DIRECTORY "${CMAKE_CURRENT_SOURCE_DIR}" PROPERTY "${imported_targets_name}" "${components}")
+            set_property(DIRECTORY "${CMAKE_CURRENT_SOURCE_DIR}" PROPERTY "${imported_args_name}" "${args}")
+        endif()
+    endif()
+
+    set(_toolbelt_find_dep_components
+        "${components}"
+        PARENT_SCOPE
+    )
+    set(_toolbelt_find_dep_count
+        "${count}"
+        PARENT_SCOPE
+    )
+endfunction()
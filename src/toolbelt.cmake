@@ -1,3 +1,5 @@
+include_guard(GLOBAL)
+
 include(code_generation)
 include(combinators)
 include(utilities)
@@ -48,6 +50,10 @@ commands are available after including with a :cmake:`toolbelt_` prefix:
 Alternatively, copy and paste the code in the `src`_ directory
 and include the library using :cmake:`include(toolbelt)`.
 
+Each module uses |include_guard| so :cmake:`include(toolbelt)` can be called from any number of directories
+without re-defining commands. To load only the commands that a directory needs, include a module directly
+instead, for example :cmake:`include(combinators)` or :cmake:`include(code_generation)`.
+
 Why does this project exist?
 ============================
 
@@ -68,6 +74,13 @@ This project contains a set of unit tests for the :cmake:`toolbelt` commands. Th
 
    pytest
 
+To compare the configure time of a project that includes :cmake:`toolbelt` from many directories with and without
+include guards, run the include benchmark:
+
+.. code-block:: shell
+
+   python -m tests.benchmark_include 500
+
 The documentation for this project (including this README) is made using `sphinx`_, and published to github pages.
 To generate documentation, run the following in the `docs`_ directory to create a static page:
 
@@ -89,6 +102,7 @@ Licence
 This project is licensed under the MIT `licence`_.
 
 .. |fetch_content| replace:: :module:`FetchContent <module:FetchContent>`
+.. |include_guard| replace:: :command:`include_guard <command:include_guard>`
 .. |check_command| replace:: :command:`check_ <command:check_symbol_exists>`
 
 .. _#embed: https://en.cppreference.com/w/c/preprocessor/embed
@@ -99,33 +113,3 @@ This project is licensed under the MIT `licence`_.
 .. _poetry: https://python-poetry.org/
 .. _sphinx: https://www.sphinx-doc.org/en/master/
 ]]
-
-#[[
-Print a status message specific to the ``toolbelt.cmake`` module. Accepts multiple ``ADD_MESSAGES`` that print
-additional ``key = value`` messages underneath the status.
-]]
-function(_toolbelt_status function message)
-    set(multi_value_args ADD_MESSAGES)
-    cmake_parse_arguments("" "" "" "${multi_value_args}" ${ARGN})
-
-    set(function_prefix "${function} - ")
-    string(LENGTH "${function_prefix}" function_prefix_length)
-    string(REPEAT " " "${function_prefix_length}" function_spaces)
-
-    set(toolbelt_prefix "cmake-toolbelt: ")
-    message(STATUS "${toolbelt_prefix}${function_prefix}${message}")
-
-    foreach(add_message IN LISTS _ADD_MESSAGES)
-        if(NOT add_message MATCHES "= $" AND NOT add_message MATCHES "^ =")
-            message(STATUS "${toolbelt_prefix}${function_spaces}${add_message}")
-        endif()
-    endforeach()
-endfunction()
-
-#[[
-Print an error message specific to the ``toolbelt.cmake`` module and exit early in the calling scope.
-]]
-macro(_toolbelt_error function message)
-    message(FATAL_ERROR "cmake-toolbelt: ${function} - ${message}")
-    return()
-endmacro()
@@ -1,3 +1,5 @@
+include_guard(GLOBAL)
+
 #[[.rst:
 .. role:: cmake(code)
    :language: cmake
@@ -101,3 +103,33 @@ macro(toolbelt_required arg)
         _toolbelt_error("toolbelt_required" "required parameter ${arg_name} not set")
     endif()
 endmacro()
+
+#[[
+Print a status message specific to the ``toolbelt.cmake`` modules. Accepts multiple ``ADD_MESSAGES`` that print
+additional ``key = value`` messages underneath the status.
+]]
+function(_toolbelt_status function message)
+    set(multi_value_args ADD_MESSAGES)
+    cmake_parse_arguments("" "" "" "${multi_value_args}" ${ARGN})
+
+    set(function_prefix "${function} - ")
+    string(LENGTH "${function_prefix}" function_prefix_length)
+    string(REPEAT " " "${function_prefix_length}" function_spaces)
+
+    set(toolbelt_prefix "cmake-toolbelt: ")
+    message(STATUS "${toolbelt_prefix}${function_prefix}${message}")
+
+    foreach(add_message IN LISTS _ADD_MESSAGES)
+        if(NOT add_message MATCHES "= $" AND NOT add_message MATCHES "^ =")
+            message(STATUS "${toolbelt_prefix}${function_spaces}${add_message}")
+        endif()
+    endforeach()
+endfunction()
+
+#[[
+Print an error message specific to the ``toolbelt.cmake`` modules and exit early in the calling scope.
+]]
+macro(_toolbelt_error function message)
+    message(FATAL_ERROR "cmake-toolbelt: ${function} - ${message}")
+    return()
+endmacro()
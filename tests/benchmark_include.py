@@ -0,0 +1,77 @@
+"""
+Benchmark the configure time of a project which includes toolbelt from many directories.
+
+Run using ``python -m tests.benchmark_include [directories]``. This compares the modules in the ``src`` directory
+against a copy of the same modules with the ``include_guard`` calls removed.
+"""
+
+import sys
+from os.path import dirname, realpath
+from pathlib import Path
+from shutil import copytree
+from subprocess import run
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+
+def write_project(project: Path, src: Path, directories: int):
+    """
+    Write a project which includes toolbelt from the top level and from each subdirectory.
+    """
+    project.mkdir(parents=True)
+
+    top_level = [
+        "cmake_minimum_required(VERSION 3.24)",
+        "project(cmake_toolbelt_benchmark NONE)",
+        f'list(APPEND CMAKE_MODULE_PATH "{src.as_posix()}")',
+        "include(toolbelt)",
+    ]
+    for directory in range(directories):
+        subdirectory = project / f"dir_{directory}"
+        subdirectory.mkdir()
+        (subdirectory / "CMakeLists.txt").write_text(
+            "include(toolbelt)\nset(arg TRUE)\ntoolbelt_required(arg)\n"
+        )
+
+        top_level.append(f"add_subdirectory(dir_{directory})")
+
+    (project / "CMakeLists.txt").write_text("\n".join(top_level) + "\n")
+
+
+def configure(project: Path) -> float:
+    """
+    Configure the project and return the elapsed time in seconds.
+    """
+    start = perf_counter()
+    run(
+        ["cmake", "-S", str(project), "-B", str(project / "build")],
+        check=True,
+        capture_output=True,
+    )
+    return perf_counter() - start
+
+
+def main(directories: int = 500):
+    """
+    Print the configure times with and without include guards.
+    """
+    src = Path(dirname(realpath(__file__))).parent / "src"
+
+    with TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+
+        unguarded = tmp_dir / "unguarded_src"
+        copytree(src, unguarded)
+        for module in unguarded.glob("*.cmake"):
+            lines = module.read_text().splitlines(keepends=True)
+            lines = [line for line in lines if line != "include_guard(GLOBAL)\n"]
+            module.write_text("".join(lines))
+
+        for name, modules in [("guarded", src), ("unguarded", unguarded)]:
+            project = tmp_dir / name
+            write_project(project, modules, directories)
+            print(f"{name}: {configure(project):.2f}s for {directories} directories")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,120 +1,326 @@
 """
 Tests for linting and checks.
+
+Each test project is built once per toolchain and the projects are checked in parallel. The default toolchain
+build is shared by the clang-tidy and memcheck checks, and the sanitizer check uses a separate clang build.
 """
 
+import json
 import os
 import platform
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from subprocess import run
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
 
 import pytest
 
 from tests.fixtures import (
-    setup_gtest,
-    run_cmake_with_assert,
+    MEMCHECK_OPTIONS,
+    conan_install,
     conan_preset,
-    add_dep,
-    check_includes,
-    check_symbol,
-    embed,
-    enum,
-    required,
-    setup_gtest,
+    copy_cmake_project,
 )
 
+JOBS = os.cpu_count() or 1
+DEFAULT_BUILD = "build"
+SANITIZER_BUILD = "build-sanitizer"
+SANITIZER_VARIABLES = {
+    "CMAKE_CXX_COMPILER": "clang++",
+    "CMAKE_CXX_FLAGS": "-fsanitize=address,undefined,leak,integer -Wall -Wextra -Wpedantic -Werror",
+}
+
+
+@dataclass
+class CheckProject:
+    """
+    A test project which is built and checked by the check runner.
+    """
+
+    name: str
+    conan: bool = False
+    ctest: bool = False
+    source: Optional[Path] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def resource_projects() -> List[CheckProject]:
+    """
+    The test projects to run checks on.
+    """
+    return [
+        CheckProject("add_dep", conan=True),
+        CheckProject("check_includes"),
+        CheckProject("check_symbol"),
+        CheckProject("embed"),
+        CheckProject("embed_pack"),
+        CheckProject("enum"),
+        CheckProject("include_modules"),
+        CheckProject("required"),
+        CheckProject("setup_gtest", conan=True, ctest=True),
+    ]
+
+
+def run_with_output(
+    command: List[str], cwd: Path, env: Optional[Dict[str, str]] = None
+):
+    """
+    Run a command with captured output so that parallel runs do not interleave, and include the output in the
+    error if the command fails.
+    """
+    result = run(command, cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise AssertionError(
+            f"`{' '.join(command)}` failed in {cwd}:\n{result.stdout}\n{result.stderr}"
+        )
+
+
+def project_workers(projects: List[CheckProject]) -> int:
+    """
+    The number of projects to process at the same time, which is capped at the number of cpus.
+    """
+    return max(1, min(len(projects), JOBS))
+
+
+def build_jobs(projects: List[CheckProject]) -> int:
+    """
+    The number of parallel jobs for each build, so that the concurrent builds share the cpus.
+    """
+    return max(1, JOBS // project_workers(projects))
+
+
+def run_parallel(projects: List[CheckProject], phase: str, function: Callable):
+    """
+    Run a phase for each project in parallel, recording the time taken per project. An error is raised containing
+    the failures of all projects.
+    """
+    if not projects:
+        return
+
+    def timed(project):
+        start = perf_counter()
+        try:
+            function(project)
+        finally:
+            project.timings[phase] = perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=project_workers(projects)) as executor:
+        futures = {
+            project.name: executor.submit(timed, project) for project in projects
+        }
 
-def run_check(
-    capfd,
-    add_dep,
-    check_includes,
-    check_symbol,
-    embed,
-    enum,
-    required,
-    setup_gtest,
-    **kwargs
+    errors = [
+        f"{name} - {future.exception()}"
+        for name, future in futures.items()
+        if future.exception() is not None
+    ]
+    if errors:
+        raise AssertionError(f"{phase} failed:\n" + "\n".join(errors))
+
+
+def build_project(
+    project: CheckProject, build_dir: str, variables: Dict[str, str], jobs: int
 ):
     """
-    Run a check test.
+    Configure and build a project in a build directory using a number of parallel jobs.
+    """
+    binary_dir = project.source / build_dir
+
+    command = ["cmake", "-S", str(project.source), "-B", str(binary_dir)]
+    if project.conan:
+        command += ["--preset", conan_preset()]
+    command += [f"-D{key}={value}" for key, value in variables.items()]
+
+    run_with_output(command, project.source)
+    command = ["cmake", "--build", str(binary_dir), "--parallel", str(jobs)]
+    run_with_output(command + ["--config", "Release"], project.source)
+
+
+def clang_tidy(projects: List[CheckProject]):
+    """
+    Run clang-tidy over the files in the compilation database of each project, similar to ``run-clang-tidy``. All
+    files share a single pool capped at the number of cpus, and the time spent on each project's files is recorded.
     """
+    files = []
+    for project in projects:
+        binary_dir = project.source / DEFAULT_BUILD
+        entries = json.loads((binary_dir / "compile_commands.json").read_text())
+        files += [
+            (project, file) for file in sorted({entry["file"] for entry in entries})
+        ]
+
+    timings = defaultdict(float)
+    lock = Lock()
+
+    def run_file(project, file):
+        start = perf_counter()
+        try:
+            run_with_output(
+                [
+                    "clang-tidy",
+                    "--quiet",
+                    "-p",
+                    str(project.source / DEFAULT_BUILD),
+                    file,
+                ],
+                project.source,
+            )
+        finally:
+            with lock:
+                timings[project.name] += perf_counter() - start
 
-    def run(resource, preset=None, build_preset=None, run_ctest=False):
-        os.chdir(resource)
-        run_cmake_with_assert(
-            capfd,
-            preset=preset,
-            build_preset=build_preset,
-            run_ctest=run_ctest,
-            **kwargs,
+    with ThreadPoolExecutor(max_workers=JOBS) as executor:
+        futures = [executor.submit(run_file, project, file) for project, file in files]
+
+    for project in projects:
+        project.timings["clang-tidy"] = timings[project.name]
+
+    errors = [str(future.exception()) for future in futures if future.exception()]
+    if errors:
+        raise AssertionError("clang-tidy failed:\n" + "\n".join(errors))
+
+
+def run_project(project: CheckProject, build_dir: str, memcheck: bool = False):
+    """
+    Run the program or the tests of a built project, optionally using valgrind.
+    """
+    binary_dir = project.source / build_dir
+
+    if project.ctest:
+        command = ["ctest", "--test-dir", str(binary_dir), "--output-on-failure"]
+        if memcheck:
+            command += [
+                "--overwrite",
+                f"MemoryCheckCommandOptions={MEMCHECK_OPTIONS}",
+                "-T",
+                "memcheck",
+            ]
+    else:
+        command = [str(binary_dir / "cmake_toolbelt_test")]
+        if memcheck:
+            command = ["valgrind"] + MEMCHECK_OPTIONS.split() + command
+
+    run_with_output(command, project.source)
+
+
+def report_timings(capfd, projects: List[CheckProject], phases: List[str]):
+    """
+    Print the time taken by each project for each phase.
+    """
+    width = max(len(project.name) for project in projects)
+
+    with capfd.disabled():
+        print()
+        print(f"{'project':<{width}}  " + "  ".join(f"{phase:>16}" for phase in phases))
+        for project in projects:
+            timings = [
+                (
+                    f"{project.timings[phase]:>15.2f}s"
+                    if phase in project.timings
+                    else f"{'-':>16}"
+                )
+                for phase in phases
+            ]
+            print(f"{project.name:<{width}}  " + "  ".join(timings))
+
+
+@pytest.fixture(scope="module")
+def check_projects(tmp_path_factory) -> List[CheckProject]:
+    """
+    Fixture which copies all test projects and installs their conanfiles in parallel.
+    """
+    projects = resource_projects()
+    for project in projects:
+        project.source = copy_cmake_project(
+            tmp_path_factory.mktemp(project.name), project.name
         )
 
-    run(add_dep, preset=conan_preset(), build_preset="conan-release")
-    run(check_includes)
-    run(check_symbol)
-    run(embed)
-    run(enum)
-    run(required)
-    run(
-        setup_gtest, preset=conan_preset(), build_preset="conan-release", run_ctest=True
+    run_parallel(
+        [project for project in projects if project.conan],
+        "conan",
+        lambda project: conan_install(project.source),
     )
 
+    return projects
+
+
+@pytest.fixture(scope="module")
+def default_builds(check_projects) -> List[CheckProject]:
+    """
+    Fixture which builds all test projects with the default toolchain, exporting a compilation database.
+    """
+    run_parallel(
+        check_projects,
+        "build",
+        lambda project: build_project(
+            project,
+            DEFAULT_BUILD,
+            {"CMAKE_EXPORT_COMPILE_COMMANDS": "ON"},
+            build_jobs(check_projects),
+        ),
+    )
+
+    return check_projects
+
+
+@pytest.fixture(scope="module")
+def sanitizer_builds(check_projects) -> List[CheckProject]:
+    """
+    Fixture which builds all test projects with clang and sanitizers enabled.
+    """
+    run_parallel(
+        check_projects,
+        "sanitizer build",
+        lambda project: build_project(
+            project, SANITIZER_BUILD, SANITIZER_VARIABLES, build_jobs(check_projects)
+        ),
+    )
+
+    return check_projects
+
 
 @pytest.mark.skipif(platform.system() != "Linux", reason="Linux only lint")
-def check_clang_tidy(
-    capfd, add_dep, check_includes, check_symbol, embed, enum, required, setup_gtest
-):
+def check_clang_tidy(capfd, default_builds):
     """
     Run clang-tidy on all test code.
     """
-    run_check(
-        capfd,
-        add_dep,
-        check_includes,
-        check_symbol,
-        embed,
-        enum,
-        required,
-        setup_gtest,
-        variables={"run_clang_tidy": "TRUE"},
-    )
+    try:
+        clang_tidy(default_builds)
+    finally:
+        report_timings(capfd, default_builds, ["conan", "build", "clang-tidy"])
 
 
 @pytest.mark.skipif(platform.system() != "Linux", reason="Linux only lint")
-def check_memcheck(
-    capfd, add_dep, check_includes, check_symbol, embed, enum, required, setup_gtest
-):
+def check_memcheck(capfd, default_builds):
     """
     Run valgrind on all test code.
     """
-    run_check(
-        capfd,
-        add_dep,
-        check_includes,
-        check_symbol,
-        embed,
-        enum,
-        required,
-        setup_gtest,
-        memcheck=True,
-    )
+    try:
+        run_parallel(
+            default_builds,
+            "memcheck",
+            lambda project: run_project(project, DEFAULT_BUILD, memcheck=True),
+        )
+    finally:
+        report_timings(capfd, default_builds, ["conan", "build", "memcheck"])
 
 
 @pytest.mark.skipif(platform.system() != "Linux", reason="Linux only lint")
-def check_sanitizer(
-    capfd, add_dep, check_includes, check_symbol, embed, enum, required, setup_gtest
-):
+def check_sanitizer(capfd, sanitizer_builds):
     """
     Run sanitizers on all test code.
     """
-    run_check(
-        capfd,
-        add_dep,
-        check_includes,
-        check_symbol,
-        embed,
-        enum,
-        required,
-        setup_gtest,
-        variables={
-            "CMAKE_CXX_COMPILER": "clang++",
-            "CMAKE_CXX_FLAGS": "-fsanitize=address,undefined,leak,integer -Wall -Wextra -Wpedantic -Werror",
-        },
-    )
+    try:
+        run_parallel(
+            sanitizer_builds,
+            "sanitizer",
+            lambda project: run_project(project, SANITIZER_BUILD),
+        )
+    finally:
+        report_timings(
+            capfd, sanitizer_builds, ["conan", "sanitizer build", "sanitizer"]
+        )
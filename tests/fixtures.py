@@ -12,6 +12,8 @@ from typing import Dict, Optional, List
 
 import pytest
 
+MEMCHECK_OPTIONS = "--leak-check=full --show-leak-kinds=all --errors-for-leak-kinds=all --error-exitcode=1"
+
 
 @pytest.fixture
 def add_dep(tmp_path, monkeypatch, request) -> Path:
@@ -49,6 +51,14 @@ def embed(tmp_path, monkeypatch) -> Path:
     return setup_cmake_project(tmp_path / "embed", monkeypatch, "embed")
 
 
+@pytest.fixture
+def embed_pack(tmp_path, monkeypatch) -> Path:
+    """
+    Fixture which sources the embed_pack data.
+    """
+    return setup_cmake_project(tmp_path / "embed_pack", monkeypatch, "embed_pack")
+
+
 @pytest.fixture
 def enum(tmp_path, monkeypatch) -> Path:
     """
@@ -57,6 +67,16 @@ def enum(tmp_path, monkeypatch) -> Path:
     return setup_cmake_project(tmp_path / "enum", monkeypatch, "enum")
 
 
+@pytest.fixture
+def include_modules(tmp_path, monkeypatch) -> Path:
+    """
+    Fixture which sources the include_modules data.
+    """
+    return setup_cmake_project(
+        tmp_path / "include_modules", monkeypatch, "include_modules"
+    )
+
+
 @pytest.fixture
 def required(tmp_path, monkeypatch) -> Path:
     """
@@ -88,16 +108,26 @@ def install_conanfile(tmp_path, monkeypatch) -> Path:
     """
     monkeypatch.setenv("CONAN_HOME", str(tmp_path))
 
-    run("conan profile detect --force".split(), check=True)
-    run(f"conan install . --build=missing".split(), check=True)
+    return conan_install(tmp_path)
 
-    return tmp_path
+
+def conan_install(project: Path) -> Path:
+    """
+    Install a conanfile for a cmake project without changing the working directory.
+    """
+    env = {**os.environ, "CONAN_HOME": str(project)}
+
+    run("conan profile detect --force".split(), check=True, cwd=project, env=env)
+    run(f"conan install . --build=missing".split(), check=True, cwd=project, env=env)
+
+    return project
 
 
 def run_cmake_with_assert(
     capfd,
     contains_messages: Optional[List[str]] = None,
     not_contains_messages: Optional[List[str]] = None,
+    message_counts: Optional[Dict[str, int]] = None,
     variables: Optional[Dict[str, str]] = None,
     preset: Optional[str] = None,
     build_preset: Optional[str] = None,
@@ -128,6 +158,8 @@ def run_cmake_with_assert(
         assert message in out
     for message in not_contains_messages or []:
         assert message not in out
+    for message, count in (message_counts or {}).items():
+        assert out.count(message) == count
 
     # Build program.
     command = add_preset("cmake --build . ", build_preset)
@@ -137,14 +169,13 @@ def run_cmake_with_assert(
     capfd.readouterr()
 
     # Run the program or the tests.
-    memcheck_options = "--leak-check=full --show-leak-kinds=all --errors-for-leak-kinds=all --error-exitcode=1"
     if run_ctest:
         command = ["ctest"]
         if memcheck:
             command += [
                 "--output-on-failure",
                 "--overwrite",
-                f"MemoryCheckCommandOptions={memcheck_options}",
+                f"MemoryCheckCommandOptions={MEMCHECK_OPTIONS}",
                 "-T",
                 "memcheck",
             ]
@@ -163,7 +194,7 @@ def run_cmake_with_assert(
 
         command = ""
         if memcheck:
-            command += f"valgrind {memcheck_options} "
+            command += f"valgrind {MEMCHECK_OPTIONS} "
         command += str(Path(os.getcwd()) / app)
 
         run(command.split(), check=True)
@@ -173,12 +204,21 @@ def setup_cmake_project(tmp_path, monkeypatch, data_path) -> Path:
     """
     This fixture copies the requested test data into a tmp_dir for cmake to run.
     """
+    copy_cmake_project(tmp_path, data_path)
+
+    monkeypatch.chdir(tmp_path)
+
+    return tmp_path
+
+
+def copy_cmake_project(tmp_path, data_path) -> Path:
+    """
+    Copy the requested test data into a tmp_dir without changing the working directory.
+    """
     file_path = Path(dirname(realpath(__file__)))
 
     copytree(file_path / "resources" / data_path, tmp_path, dirs_exist_ok=True)
     copytree(file_path.parent / "src", tmp_path, dirs_exist_ok=True)
     copy(file_path.parent / ".clang-tidy", tmp_path)
 
-    monkeypatch.chdir(tmp_path)
-
     return tmp_path
@@ -0,0 +1,38 @@
+#include <iostream>
+#include <string>
+
+#include "resources.h"
+#include "resources_aligned.h"
+
+template <typename Span>
+std::string to_string(const Span &span) {
+    return std::string{reinterpret_cast<const char *>(span.data()), span.size()};
+}
+
+int main() {
+    auto pack = application::detail::resources::open(RESOURCES_PACK);
+    auto aligned_pack = resources_aligned::open(RESOURCES_ALIGNED_PACK);
+    if (!pack || !aligned_pack) {
+        return 1;
+    }
+
+    std::cout << to_string(pack->get(0));
+    std::cout << to_string(pack->get(1));
+    auto embed_one = aligned_pack->find("embed_one.txt");
+    if (!embed_one) {
+        return 1;
+    }
+
+    std::cout << to_string(aligned_pack->get(0));
+    std::cout << to_string(*embed_one);
+
+    // A pack is rejected if it does not match the generated code.
+    if (resources_aligned::open(RESOURCES_PACK)) {
+        return 1;
+    }
+    if (pack->find("missing.txt") || !pack->get(2).empty()) {
+        return 1;
+    }
+
+    return 0;
+}
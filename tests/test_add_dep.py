@@ -109,3 +109,91 @@ def test_add_dep_extra_args_invalid(add_dep, capfd):
             preset=conan_preset(),
             build_preset="conan-release",
         )
+
+
+def test_add_deps(add_dep, capfd):
+    """
+    Test that add deps links components to multiple targets with a single summary.
+    """
+    run_cmake_with_assert(
+        capfd,
+        contains_messages=[
+            "cmake-toolbelt: toolbelt_add_deps - linked ZLIB to cmake_toolbelt_test, cmake_toolbelt_test_other\n",
+            "cmake-toolbelt: toolbelt_add_deps - linked ZLIB to cmake_toolbelt_test\n",
+        ],
+        not_contains_messages=[
+            "cmake-toolbelt: toolbelt_add_dep - component",
+            "visibility =",
+        ],
+        message_counts={
+            "cmake-toolbelt: toolbelt_add_deps - found ZLIB with components": 1,
+            "components = ZLIB::ZLIB": 2,
+        },
+        variables={"batch": "TRUE"},
+        preset=conan_preset(),
+        build_preset="conan-release",
+    )
+
+
+def test_add_deps_components(add_dep, capfd):
+    """
+    Test that add deps links manually specified components to multiple targets with a visibility.
+    """
+    run_cmake_with_assert(
+        capfd,
+        contains_messages=[
+            "cmake-toolbelt: toolbelt_add_deps - linked ZLIB to cmake_toolbelt_test, cmake_toolbelt_test_other",
+            "visibility = PRIVATE",
+        ],
+        not_contains_messages=["zlib_DEPS_TARGET linked"],
+        variables={
+            "batch": "TRUE",
+            "components": "ZLIB::ZLIB",
+            "visibility": "PRIVATE",
+        },
+        preset=conan_preset(),
+        build_preset="conan-release",
+    )
+
+
+def test_add_deps_mixed(add_dep, capfd):
+    """
+    Test that add dep and add deps share cached components when called with different arguments.
+    """
+    run_cmake_with_assert(
+        capfd,
+        contains_messages=[
+            "cmake-toolbelt: toolbelt_add_deps - linked ZLIB to cmake_toolbelt_test_other\n",
+            "components = ZLIB::ZLIB",
+        ],
+        not_contains_messages=["no components of ZLIB linked"],
+        message_counts={
+            "found ZLIB with components": 1,
+            "cmake-toolbelt: toolbelt_add_dep - component ZLIB::ZLIB linked to cmake_toolbelt_test\n": 2,
+        },
+        variables={"mixed": "TRUE"},
+        preset=conan_preset(),
+        build_preset="conan-release",
+    )
+
+
+def test_add_deps_subdirectory(add_dep, capfd):
+    """
+    Test that finding a dependency in a subdirectory does not prevent the parent directory from linking it.
+    """
+    run_cmake_with_assert(
+        capfd,
+        contains_messages=[
+            "cmake-toolbelt: toolbelt_add_dep - component ZLIB::ZLIB linked to cmake_toolbelt_test_before\n",
+            "cmake-toolbelt: toolbelt_add_deps - linked ZLIB to cmake_toolbelt_test\n",
+            "cmake-toolbelt: toolbelt_add_deps - linked ZLIB to cmake_toolbelt_test_after\n",
+        ],
+        not_contains_messages=["no components of ZLIB linked"],
+        message_counts={
+            "found ZLIB with components": 2,
+            "components = ZLIB::ZLIB": 2,
+        },
+        variables={"subdirectory": "TRUE"},
+        preset=conan_preset(),
+        build_preset="conan-release",
+    )
@@ -0,0 +1,52 @@
+"""
+Tests for the embed pack function.
+"""
+
+from subprocess import CalledProcessError
+
+import pytest
+
+from tests.fixtures import embed_pack, run_cmake_with_assert
+
+
+def test_embed_pack(embed_pack, capfd):
+    """
+    Test that embed pack generates a pack file and a loader which reads resources from it.
+    """
+    run_cmake_with_assert(
+        capfd,
+        contains_messages=[
+            "cmake-toolbelt: toolbelt_embed_pack - packing 2 files",
+            "alignment = 4096",
+            "alignment = 16",
+            "cmake-toolbelt: toolbelt_embed_pack - generated output files",
+            "cmake-toolbelt: toolbelt_embed_pack - pack file at",
+            "cmake-toolbelt: toolbelt_embed_pack - linking generated files to target cmake_toolbelt_test",
+        ],
+    )
+
+    embed_one = (embed_pack / "embed_one.txt").read_text()
+    embed_two = (embed_pack / "embed_two.txt").read_text()
+
+    expected = embed_one + embed_two + embed_two + embed_one
+
+    out, _ = capfd.readouterr()
+
+    assert out == expected
+
+    # A pack without a target is built by default.
+    assert (embed_pack / "other" / "resources.pack").exists()
+
+
+def test_embed_pack_duplicate(embed_pack, capfd):
+    """
+    Test that embed pack fails when the same pack is generated twice.
+    """
+    with pytest.raises(CalledProcessError):
+        run_cmake_with_assert(capfd, variables={"duplicate": "TRUE"})
+
+    # CMake wraps long error messages across lines.
+    _, err = capfd.readouterr()
+    err = " ".join(err.split())
+    assert "cmake-toolbelt: toolbelt_embed_pack - pack" in err
+    assert "is already generated, use a different variable or PACK_DIR" in err
@@ -0,0 +1,19 @@
+"""
+Tests for including toolbelt modules.
+"""
+
+from tests.fixtures import include_modules, run_cmake_with_assert
+
+
+def test_include_modules(include_modules, capfd):
+    """
+    Test that modules can be included individually and repeatedly without redefining commands.
+    """
+    run_cmake_with_assert(
+        capfd,
+        contains_messages=[
+            "utilities loaded without combinators or code_generation",
+            "combinators loaded without code_generation",
+            "toolbelt commands not redefined",
+        ],
+    )